@@ -1,353 +1,582 @@
-import os
-import requests
-import pandas as pd
-import streamlit as st
-import altair as alt
-
-# -------------------------------------------------------------------
-# Config
-# -------------------------------------------------------------------
-st.set_page_config(
-    page_title="Chicago Crime Observatory",
-    layout="wide",
-)
-
-API_URL = "https://data.cityofchicago.org/resource/ijzp-q8t2.json"
-alt.data_transformers.disable_max_rows()
-
-# -------------------------------------------------------------------
-# Helper: resident-friendly categories
-# -------------------------------------------------------------------
-def categorize_for_resident(crime_type: str) -> str:
-    if not isinstance(crime_type, str):
-        return "Other / Uncategorized"
-
-    c = crime_type.upper()
-
-    property_keywords = [
-        "THEFT", "BURGLARY", "ROBBERY", "MOTOR VEHICLE THEFT",
-        "CRIMINAL DAMAGE", "DECEPTIVE PRACTICE", "ARSON",
-    ]
-    violent_keywords = [
-        "BATTERY", "ASSAULT", "HOMICIDE", "KIDNAPPING",
-        "CRIM SEXUAL ASSAULT", "SEX OFFENSE",
-    ]
-    public_safety_keywords = [
-        "PUBLIC PEACE VIOLATION", "INTERFERENCE WITH PUBLIC OFFICER",
-        "WEAPONS VIOLATION", "HUMAN TRAFFICKING", "PROSTITUTION",
-        "GAMBLING", "NARCOTICS", "OTHER NARCOTIC VIOLATION",
-        "LIQUOR LAW VIOLATION", "OBSCENITY",
-    ]
-
-    if any(k in c for k in property_keywords):
-        return "Property Crime"
-    if any(k in c for k in violent_keywords):
-        return "Violent Crime"
-    if any(k in c for k in public_safety_keywords):
-        return "Public Safety / Nuisance"
-    return "Other / Uncategorized"
-
-# -------------------------------------------------------------------
-# Data loading (Optimized)
-# -------------------------------------------------------------------
-@st.cache_data(ttl=3600)
-def load_data(limit: int = 300_000) -> pd.DataFrame:
-    """
-    Pulls crime data from the Chicago Socrata API (last 365 days).
-    Uses server-side filtering ($where) to fetch only relevant records.
-    """
-    # Calculate date for server-side filter
-    one_year_ago = pd.Timestamp.now() - pd.DateOffset(years=1)
-    one_year_ago_str = one_year_ago.strftime("%Y-%m-%dT%H:%M:%S")
-
-    params = {
-        "$limit": limit,
-        "$order": "date DESC",
-        "$where": f"date >= '{one_year_ago_str}'"
-    }
-
-    token = os.getenv("CHICAGO_APP_TOKEN")
-    headers = {"X-App-Token": token} if token else {}
-
-    try:
-        resp = requests.get(API_URL, params=params, headers=headers, timeout=60)
-        resp.raise_for_status()
-        raw = resp.json()
-        
-        df = pd.json_normalize(raw)
-        
-        if df.empty:
-            return df
-
-        # Date/time processing
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.dropna(subset=["date"])
-        
-        df["date_only"] = df["date"].dt.date
-        df["hour"] = df["date"].dt.hour
-        df["weekday"] = df["date"].dt.day_name()
-        
-        # Column cleanup
-        df.rename(columns={"primary_type": "primary_description"}, inplace=True)
-        
-        # Explicit type conversion for safety
-        df["latitude"] = pd.to_numeric(df.get("latitude"), errors="coerce")
-        df["longitude"] = pd.to_numeric(df.get("longitude"), errors="coerce")
-        
-        # Fix: Convert to Int64 (nullable int) to handle "25" vs "25.0" mismatch with GeoJSON
-        df["community_area"] = pd.to_numeric(df.get("community_area"), errors="coerce").astype("Int64")
-        
-        # Resident-friendly buckets
-        df["resident_category"] = df["primary_description"].apply(categorize_for_resident)
-
-        return df
-
-    except Exception as e:
-        st.error(f"Failed to load data: {e}")
-        return pd.DataFrame()
-
-@st.cache_data(ttl=3600)
-def get_chicago_neighborhoods():
-    """Fetch and cache the GeoJSON data"""
-    GEOJSON_URL = "https://data.cityofchicago.org/resource/igwz-8jzy.geojson"
-    return alt.Data(
-        url=GEOJSON_URL,
-        format=alt.DataFormat(property='features', type='json')
-    )
-
-# -------------------------------------------------------------------
-# Sidebar controls
-# -------------------------------------------------------------------
-st.sidebar.title("Chicago Crime Observatory")
-
-if st.sidebar.button("🔄 Refresh"):
-    st.cache_data.clear()
-    st.sidebar.success("Cache cleared – data will be reloaded.")
-
-with st.spinner("Loading crime data from Chicago API…"):
-    df = load_data()
-
-if df.empty:
-    st.warning("No data loaded. Please check the API connection.")
-    st.stop()
-
-# Date range selection
-min_date = df["date_only"].min()
-max_date = df["date_only"].max()
-
-if "start_date" not in st.session_state:
-    st.session_state.start_date = min_date
-if "end_date" not in st.session_state:
-    st.session_state.end_date = max_date
-
-date_range = st.sidebar.date_input(
-    "Date range",
-    value=(st.session_state.start_date, st.session_state.end_date),
-    min_value=min_date,
-    max_value=max_date,
-)
-if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
-    st.session_state.start_date, st.session_state.end_date = date_range
-
-start_date = st.session_state.start_date
-end_date = st.session_state.end_date
-
-# Crime Type filter
-all_cats = sorted(df["primary_description"].dropna().unique())
-selected_cats = st.sidebar.multiselect("Crime Types", options=all_cats, default=[])
-
-# Domestic filter
-domestic_filter = st.sidebar.selectbox(
-    "Domestic incidents filter",
-    options=["All incidents", "Domestic only", "Non-domestic only"],
-    index=0,
-)
-
-# -------------------------------------------------------------------
-# Filter Logic
-# -------------------------------------------------------------------
-mask = (df["date_only"] >= start_date) & (df["date_only"] <= end_date)
-
-if domestic_filter == "Domestic only":
-    mask &= df["domestic"] == True
-elif domestic_filter == "Non-domestic only":
-    mask &= df["domestic"] == False
-
-if selected_cats:
-    mask &= df["primary_description"].isin(selected_cats)
-
-filtered_df = df.loc[mask].copy()
-
-# -------------------------------------------------------------------
-# Main Content
-# -------------------------------------------------------------------
-st.title("Chicago Crime Observatory")
-
-st.markdown("""
-### About the Chicago Crime Observatory
-Welcome to the Chicago Crime Observatory. This dashboard is designed for residents, researchers, and potential movers who want to answer the question: **"When and where does crime happen in Chicago?"**
-
-Unlike static annual reports, this tool offers a dynamic window into the city's safety trends. We analyze the last 365 days of reported incidents directly from the Chicago Data Portal. By filtering out administrative noise and focusing on primary crime categories, we aim to reveal the underlying "rhythm" of the city—from seasonal spikes in activity to the specific hourly footprints of different offenses.
-""")
-
-st.markdown(f"**Rows after filters:** {len(filtered_df):,} (out of {len(df):,} total incidents)")
-st.divider()
-
-# -------------------------------------------------------------------
-# 1. Daily Trend
-# -------------------------------------------------------------------
-st.subheader("1. The Daily Rhythm: Seasonal & Weekly Patterns")
-st.markdown("""
-Crime is rarely random; it follows distinct temporal patterns. The timeline below tracks the total volume of reported incidents over the past year.
-
-Because daily data can be "noisy"—spiking erratically due to random events—we use a **7-Day Rolling Average** (the red line) to smooth out these fluctuations. This reveals the true trend. Look for the "Summer Spike," a common phenomenon in Chicago where incident reports rise with the temperature, and notice how activity often dips during major winter holidays.
-""")
-
-daily = filtered_df.groupby("date_only").size().reset_index(name="incidents").sort_values("date_only")
-daily["rolling_incidents"] = daily["incidents"].rolling(window=7, min_periods=1).mean()
-
-if not daily.empty:
-    daily_chart = (
-        alt.Chart(daily)
-        .mark_line(color="#d62728")
-        .encode(
-            x=alt.X("date_only:T", title="Date"),
-            y=alt.Y("rolling_incidents:Q", title="7-Day Rolling Average"),
-            tooltip=["date_only:T", "incidents:Q", "rolling_incidents:Q"]
-        )
-        .properties(height=300)
-    )
-    st.altair_chart(daily_chart, use_container_width=True)
-else:
-    st.info("No data available for the timeline.")
-
-st.divider()
-
-# -------------------------------------------------------------------
-# 2. Interactive Dashboard
-# -------------------------------------------------------------------
-st.subheader("2. Interactive Analysis: Correlating Crime Types with Locations")
-st.markdown("""
-Safety varies significantly by neighborhood and by the type of offense. This interactive section lets you drill down into those specifics.
-
-**How to use this:** The Bar Chart (left) and the Map (right) are linked. **Click on any bar**—for example, "MOTOR VEHICLE THEFT"—to instantly filter the map. This interaction reveals hidden spatial truths: you might find that while Battery incidents are widespread, Theft is often concentrated in high-traffic commercial districts. Unselected bars will fade to gray, indicating that the map is currently focused on your selection.
-""")
-
-# Prepare Interaction Data
-# Groupings must preserve numeric integrity but be serializable
-chart_data = filtered_df.groupby(["primary_description", "community_area"]).size().reset_index(name="count")
-
-# Ensure types for Altair
-chart_data["count"] = chart_data["count"].astype(int)
-# Convert Int64 community_area to string for lookup keys (removing .0)
-chart_data["community_area"] = chart_data["community_area"].astype(str)
-
-if not chart_data.empty:
-    # Selection Signal
-    selection = alt.selection_point(fields=["primary_description"], on="click")
-
-    # Bar Chart (Left)
-    bar_chart = (
-        alt.Chart(chart_data)
-        .transform_aggregate(
-            total_count="sum(count)",
-            groupby=["primary_description"]
-        )
-        .transform_window(
-            rank="rank(total_count)",
-            sort=[alt.SortField("total_count", order="descending")]
-        )
-        .transform_filter(alt.datum.rank <= 20)
-        .mark_bar()
-        .encode(
-            x=alt.X("total_count:Q", title="Incidents"),
-            y=alt.Y("primary_description:N", sort="-x", title="Crime Type"),
-            color=alt.condition(
-                selection,
-                alt.value("#1f77b4"),  # Selected: Blue
-                alt.value("lightgray") # Unselected: Gray
-            ),
-            tooltip=["primary_description:N", "total_count:Q"]
-        )
-        .add_params(selection)
-        .properties(title="Top Crime Types (Click to Filter Map)", width="container", height=400)
-    )
-
-    # Map Chart (Right)
-    chicago_neighborhoods = get_chicago_neighborhoods()
-    
-    map_chart = (
-        alt.Chart(chart_data)
-        .transform_filter(selection)
-        .transform_aggregate(
-            crime_count="sum(count)",
-            groupby=["community_area"]
-        )
-        .transform_lookup(
-            lookup="community_area",
-            from_=alt.LookupData(
-                data=chicago_neighborhoods,
-                key="properties.area_num_1",
-                fields=["type", "geometry", "properties"]
-            )
-        )
-        .transform_calculate(
-            crime_count_filled="isValid(datum.crime_count) ? datum.crime_count : 0"
-        )
-        .mark_geoshape(stroke="white", strokeWidth=0.5)
-        .encode(
-            color=alt.Color(
-                "crime_count_filled:Q",
-                title="Counts",
-                scale=alt.Scale(scheme="reds")
-            ),
-            tooltip=[
-                alt.Tooltip("properties.community:N", title="Community"),
-                alt.Tooltip("crime_count_filled:Q", title="Count"),
-            ]
-        )
-        .project(type="mercator")
-        .properties(title="Geospatial Distribution", width="container", height=400)
-    )
-
-    # Use hconcat for Linked Views side-by-side layout
-    combined_dashboard = alt.hconcat(bar_chart, map_chart).resolve_legend(color="independent")
-    
-    st.altair_chart(combined_dashboard, use_container_width=True)
-
-else:
-    st.info("No data available for the dashboard.")
-
-st.divider()
-
-# -------------------------------------------------------------------
-# 3. Heatmap
-# -------------------------------------------------------------------
-st.subheader("3. The 'Risk Clock': Weekday vs. Hour Analysis")
-st.markdown("""
-Beyond where crime happens, it is crucial to understand when it happens. This heatmap aggregates thousands of incidents to visualize the city's "Risk Clock."
-
-The vertical axis represents the **Day of the Week**, while the horizontal axis tracks the **Hour of the Day** (0–23). Darker orange zones indicate high-intensity windows. You will often see distinct "signatures" here: the morning rush hour may bring a wave of property crimes, while late nights on weekends often see a rise in public safety incidents. Use this to understand the typical weekly schedule of safety in Chicago.
-""")
-
-hourly = filtered_df.groupby(["weekday", "hour"]).size().reset_index(name="count")
-weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
-if not hourly.empty:
-    heatmap = (
-        alt.Chart(hourly)
-        .mark_rect()
-        .encode(
-            x=alt.X("hour:O", title="Hour (0-23)"),
-            y=alt.Y("weekday:N", title="Day", sort=weekday_order),
-            color=alt.Color("count:Q", title="Incidents", scale=alt.Scale(scheme="oranges")),
-            tooltip=["weekday:N", "hour:O", "count:Q"]
-        )
-        .properties(height=350)
-    )
-    st.altair_chart(heatmap, use_container_width=True)
-else:
-    st.info("No data available for heatmap.")
-
-st.divider()
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ijson
+import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
+import pandas as pd
+import streamlit as st
+import altair as alt
+
+# -------------------------------------------------------------------
+# Config
+# -------------------------------------------------------------------
+st.set_page_config(
+    page_title="Chicago Crime Observatory",
+    layout="wide",
+)
+
+API_URL = "https://data.cityofchicago.org/resource/ijzp-q8t2.json"
+alt.data_transformers.disable_max_rows()
+
+# Copy-on-write makes slices safe to hold without defensive .copy() calls
+pd.set_option("mode.copy_on_write", True)
+
+# Only these Socrata columns are used downstream; the rest are never
+# materialized when a page is parsed, so the cached frame stays small.
+WANTED_COLUMNS = [
+    "date", "primary_type", "domestic",
+    "latitude", "longitude", "community_area",
+]
+
+# Paged fetch settings: Socrata handles 25k-row pages comfortably, and eight
+# keep-alive connections let the pages download and decode concurrently.
+PAGE_SIZE = 25_000
+FETCH_WORKERS = 8
+
+# File-backed cache tier: survives Streamlit restarts, so a cold start reads
+# a small Parquet file instead of re-pulling 300k rows from the API.
+CACHE_TTL_SECONDS = 3600
+CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".streamlit", "chicago_crime_cache.parquet"
+)
+
+# -------------------------------------------------------------------
+# Helper: resident-friendly categories
+# -------------------------------------------------------------------
+# Uppercase alternation patterns used for the vectorized categorization in
+# load_data. "THEFT" also covers "MOTOR VEHICLE THEFT" and "NARCOTIC" covers
+# both "NARCOTICS" and "OTHER NARCOTIC VIOLATION".
+PROPERTY_RE = r"THEFT|BURGLARY|ROBBERY|CRIMINAL DAMAGE|DECEPTIVE PRACTICE|ARSON"
+VIOLENT_RE = r"BATTERY|ASSAULT|HOMICIDE|KIDNAPPING|SEX OFFENSE"
+PUBLIC_SAFETY_RE = (
+    r"PUBLIC PEACE VIOLATION|INTERFERENCE WITH PUBLIC OFFICER|"
+    r"WEAPONS VIOLATION|HUMAN TRAFFICKING|PROSTITUTION|"
+    r"GAMBLING|NARCOTIC|LIQUOR LAW VIOLATION|OBSCENITY"
+)
+
+# Compiled once for the scalar path below; the vectorized pass in load_data
+# uses the raw alternation strings directly
+_PROPERTY_PATTERN = re.compile(PROPERTY_RE)
+_VIOLENT_PATTERN = re.compile(VIOLENT_RE)
+_PUBLIC_SAFETY_PATTERN = re.compile(PUBLIC_SAFETY_RE)
+
+
+def categorize_for_resident(crime_type: str) -> str:
+    """Row-at-a-time fallback sharing the same patterns as the vectorized pass."""
+    if not isinstance(crime_type, str):
+        return "Other / Uncategorized"
+
+    c = crime_type.upper()
+
+    if _PROPERTY_PATTERN.search(c):
+        return "Property Crime"
+    if _VIOLENT_PATTERN.search(c):
+        return "Violent Crime"
+    if _PUBLIC_SAFETY_PATTERN.search(c):
+        return "Public Safety / Nuisance"
+    return "Other / Uncategorized"
+
+# -------------------------------------------------------------------
+# Data loading (Optimized)
+# -------------------------------------------------------------------
+@st.cache_resource(ttl=CACHE_TTL_SECONDS)
+def load_data(limit: int = 300_000) -> pd.DataFrame:
+    """
+    Pulls crime data from the Chicago Socrata API (last 365 days).
+    Uses server-side filtering ($where) to fetch only relevant records.
+    Results are also persisted to a Parquet file so a cold start (fresh
+    container or Streamlit restart) skips the API entirely.
+
+    cache_resource hands every caller the same frame without the pickle
+    round-trip cache_data does per access; the app treats it as read-only
+    (enforced in spirit by copy-on-write), so sharing is safe. Small
+    aggregates stay on cache_data where serialization is cheap.
+    """
+    # Fresh-enough Parquet on disk beats re-downloading and re-parsing
+    try:
+        if time.time() - os.path.getmtime(CACHE_PATH) < CACHE_TTL_SECONDS:
+            # Row order is preserved in the file; only the index needs rebuilding
+            return pd.read_parquet(CACHE_PATH).set_index("date", drop=False)
+    except OSError:
+        pass
+
+    # Calculate date for server-side filter
+    one_year_ago = pd.Timestamp.now() - pd.DateOffset(years=1)
+    one_year_ago_str = one_year_ago.strftime("%Y-%m-%dT%H:%M:%S")
+
+    params = {
+        "$select": ",".join(WANTED_COLUMNS),
+        "$order": "date DESC",
+        "$where": f"date >= '{one_year_ago_str}'"
+    }
+
+    token = os.getenv("CHICAGO_APP_TOKEN")
+    headers = {"X-App-Token": token} if token else {}
+
+    try:
+        # Pull the window as concurrent 25k-row pages over pooled keep-alive
+        # connections instead of one giant blocking GET
+        session = requests.Session()
+        session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS),
+        )
+
+        def fetch_page(offset: int) -> pd.DataFrame:
+            page_params = {**params, "$limit": PAGE_SIZE, "$offset": offset}
+            resp = session.get(
+                API_URL, params=page_params, headers=headers, timeout=60, stream=True
+            )
+            resp.raise_for_status()
+            # Stream-decode records one at a time straight off the socket so
+            # the page never exists as both raw bytes and a list of dicts
+            with resp:
+                resp.raw.decode_content = True  # transparently un-gzip
+                records = ijson.items(resp.raw, "item")
+                return pd.DataFrame.from_records(records, columns=WANTED_COLUMNS)
+
+        offsets = range(0, limit, PAGE_SIZE)
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            pages = [page for page in pool.map(fetch_page, offsets) if not page.empty]
+
+        if not pages:
+            return pd.DataFrame()
+
+        df = pd.concat(pages, copy=False, ignore_index=True)
+
+        # Date/time processing
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = df.dropna(subset=["date"])
+        
+        # datetime64 midnights, not Python date objects: comparisons and the
+        # daily groupby stay in NumPy instead of per-row Python dispatch
+        df["date_only"] = df["date"].dt.floor("D")
+        # int8 codes, not strings: day names are only needed at chart time
+        df["hour"] = df["date"].dt.hour.astype("int8")
+        df["weekday"] = df["date"].dt.dayofweek.astype("int8")
+        
+        # Column cleanup
+        df.rename(columns={"primary_type": "primary_description"}, inplace=True)
+        
+        # Explicit type conversion for safety; float32 is plenty of precision
+        # for city-scale coordinates and halves the column size
+        df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce", downcast="float")
+        df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce", downcast="float")
+
+        # Socrata emits real JSON booleans; one byte per row beats a column
+        # of PyObject pointers compared element-by-element
+        df["domestic"] = df["domestic"].astype("bool")
+
+        # Nullable int to handle "25" vs "25.0" mismatch with GeoJSON;
+        # Int16 is ample for Chicago's 77 community areas
+        df["community_area"] = pd.to_numeric(df["community_area"], errors="coerce").astype("Int16")
+        
+        # Resident-friendly buckets (vectorized: one C-level regex scan per
+        # bucket instead of a Python call per row)
+        desc_upper = df["primary_description"].astype("string").str.upper()
+        df["resident_category"] = np.select(
+            [
+                desc_upper.str.contains(PROPERTY_RE, regex=True, na=False),
+                desc_upper.str.contains(VIOLENT_RE, regex=True, na=False),
+                desc_upper.str.contains(PUBLIC_SAFETY_RE, regex=True, na=False),
+            ],
+            ["Property Crime", "Violent Crime", "Public Safety / Nuisance"],
+            default="Other / Uncategorized",
+        )
+        df["resident_category"] = df["resident_category"].astype("category")
+
+        # ~35 unique crime types across up to 300k rows: categorical codes
+        # shrink the column ~10x and speed up every groupby on it
+        df["primary_description"] = df["primary_description"].astype("category")
+
+        # Monotonic DatetimeIndex: the date-range filter becomes an O(log N)
+        # binary-search slice instead of a full boolean scan per interaction
+        df = df.sort_values("date").set_index("date", drop=False)
+
+        # Best effort: a failed write just means the next cold start refetches
+        try:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            df.to_parquet(CACHE_PATH, compression="zstd", index=False)
+        except (OSError, ImportError):
+            pass
+
+        return df
+
+    except Exception as e:
+        st.error(f"Failed to load data: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=86400)
+def get_chicago_neighborhoods():
+    """
+    Fetch the community-area GeoJSON once server-side and embed its features
+    in the chart spec, sparing every visitor a cross-origin fetch. Boundaries
+    change rarely, so a day-long TTL is fine. Coordinates are rounded to five
+    decimals (~1 m) to keep the embedded spec small.
+    """
+    GEOJSON_URL = "https://data.cityofchicago.org/resource/igwz-8jzy.geojson"
+    geojson = requests.get(GEOJSON_URL, timeout=60).json()
+
+    def round_coords(node):
+        if isinstance(node, float):
+            return round(node, 5)
+        if isinstance(node, list):
+            return [round_coords(item) for item in node]
+        return node
+
+    for feature in geojson.get("features", []):
+        geometry = feature.get("geometry") or {}
+        if "coordinates" in geometry:
+            geometry["coordinates"] = round_coords(geometry["coordinates"])
+
+    return alt.Data(values=geojson.get("features", []))
+
+# -------------------------------------------------------------------
+# Aggregation cubes
+# -------------------------------------------------------------------
+# Small pre-aggregated frames over the full dataset, keyed by each chart's
+# group columns plus the sidebar filter dimensions (domestic, crime type).
+# Applying filters then reduces a few hundred cube rows instead of
+# regrouping 300k raw rows on every rerun. _df is excluded from hashing;
+# data_token invalidates the cubes when fresh data arrives.
+@st.cache_data(ttl=CACHE_TTL_SECONDS)
+def daily_cube(_df: pd.DataFrame, data_token) -> pd.DataFrame:
+    return (
+        _df.groupby(["date_only", "domestic", "primary_description"], observed=True, sort=False)
+        .size()
+        .reset_index(name="count")
+    )
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS)
+def crime_area_cube(_df: pd.DataFrame, data_token) -> pd.DataFrame:
+    return (
+        _df.groupby(["primary_description", "community_area", "domestic"], observed=True, sort=False)
+        .size()
+        .reset_index(name="count")
+    )
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS)
+def weekday_hour_cube(_df: pd.DataFrame, data_token) -> pd.DataFrame:
+    return (
+        _df.groupby(["weekday", "hour", "domestic", "primary_description"], observed=True, sort=False)
+        .size()
+        .reset_index(name="count")
+    )
+
+# -------------------------------------------------------------------
+# Sidebar controls
+# -------------------------------------------------------------------
+st.sidebar.title("Chicago Crime Observatory")
+
+if st.sidebar.button("🔄 Refresh"):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    try:
+        os.remove(CACHE_PATH)
+    except OSError:
+        pass
+    st.sidebar.success("Cache cleared – data will be reloaded.")
+
+with st.spinner("Loading crime data from Chicago API…"):
+    df = load_data()
+
+if df.empty:
+    st.warning("No data loaded. Please check the API connection.")
+    st.stop()
+
+data_token = (len(df), df["date"].max())
+
+# Date range selection (plain date objects for the widget/session state)
+min_date = df["date_only"].min().date()
+max_date = df["date_only"].max().date()
+
+if "start_date" not in st.session_state:
+    st.session_state.start_date = min_date
+if "end_date" not in st.session_state:
+    st.session_state.end_date = max_date
+
+date_range = st.sidebar.date_input(
+    "Date range",
+    value=(st.session_state.start_date, st.session_state.end_date),
+    min_value=min_date,
+    max_value=max_date,
+)
+if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+    st.session_state.start_date, st.session_state.end_date = date_range
+
+start_date = st.session_state.start_date
+end_date = st.session_state.end_date
+
+# Crime Type filter
+all_cats = sorted(df["primary_description"].dropna().unique())
+selected_cats = st.sidebar.multiselect("Crime Types", options=all_cats, default=[])
+
+# Domestic filter
+domestic_filter = st.sidebar.selectbox(
+    "Domestic incidents filter",
+    options=["All incidents", "Domestic only", "Non-domestic only"],
+    index=0,
+)
+
+# -------------------------------------------------------------------
+# Filter Logic
+# -------------------------------------------------------------------
+# Partial-string slicing on the sorted DatetimeIndex binary-searches the
+# range bounds (end day inclusive); the remaining masks then only touch the
+# in-range rows instead of the full frame.
+window = df.loc[str(start_date):str(end_date)]
+
+if domestic_filter == "Domestic only":
+    window = window[window["domestic"]]
+elif domestic_filter == "Non-domestic only":
+    window = window[~window["domestic"]]
+
+if selected_cats:
+    window = window[window["primary_description"].isin(selected_cats)]
+
+filtered_df = window
+
+# The cubes carry domestic and crime type in their group keys, so those
+# filters can be applied after aggregation. The date range can only be
+# applied post-aggregation where date_only is itself a group key (the daily
+# cube); the other cubes are usable only when the full range is selected.
+is_full_date_range = start_date <= min_date and end_date >= max_date
+
+def apply_filters_to_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    if domestic_filter == "Domestic only":
+        cube = cube[cube["domestic"]]
+    elif domestic_filter == "Non-domestic only":
+        cube = cube[~cube["domestic"]]
+    if selected_cats:
+        cube = cube[cube["primary_description"].isin(selected_cats)]
+    return cube
+
+# -------------------------------------------------------------------
+# Main Content
+# -------------------------------------------------------------------
+st.title("Chicago Crime Observatory")
+
+st.markdown("""
+### About the Chicago Crime Observatory
+Welcome to the Chicago Crime Observatory. This dashboard is designed for residents, researchers, and potential movers who want to answer the question: **"When and where does crime happen in Chicago?"**
+
+Unlike static annual reports, this tool offers a dynamic window into the city's safety trends. We analyze the last 365 days of reported incidents directly from the Chicago Data Portal. By filtering out administrative noise and focusing on primary crime categories, we aim to reveal the underlying "rhythm" of the city—from seasonal spikes in activity to the specific hourly footprints of different offenses.
+""")
+
+st.markdown(f"**Rows after filters:** {len(filtered_df):,} (out of {len(df):,} total incidents)")
+st.divider()
+
+# -------------------------------------------------------------------
+# 1. Daily Trend
+# -------------------------------------------------------------------
+# Each section is a fragment, so an interaction inside one chart reruns
+# only that section rather than the whole script.
+@st.fragment
+def daily_section():
+    st.subheader("1. The Daily Rhythm: Seasonal & Weekly Patterns")
+    st.markdown("""
+Crime is rarely random; it follows distinct temporal patterns. The timeline below tracks the total volume of reported incidents over the past year.
+
+Because daily data can be "noisy"—spiking erratically due to random events—we use a **7-Day Rolling Average** (the red line) to smooth out these fluctuations. This reveals the true trend. Look for the "Summer Spike," a common phenomenon in Chicago where incident reports rise with the temperature, and notice how activity often dips during major winter holidays.
+""")
+
+    daily = apply_filters_to_cube(daily_cube(df, data_token))
+    daily = daily[
+        (daily["date_only"] >= pd.Timestamp(start_date))
+        & (daily["date_only"] <= pd.Timestamp(end_date))
+    ]
+    daily = (
+        daily.groupby("date_only", sort=False)["count"]
+        .sum()
+        .reset_index()
+        .rename(columns={"count": "incidents"})
+    )
+    # Reindex onto the full selected range so missing days count as zero;
+    # otherwise the 7-row rolling window silently spans calendar gaps
+    daily = (
+        daily.set_index("date_only")
+        .reindex(pd.date_range(start_date, end_date, freq="D"), fill_value=0)
+        .rename_axis("date_only")
+        .reset_index()
+    )
+    # Compact ints serialize smaller than float64 in the chart spec
+    daily["incidents"] = daily["incidents"].astype("int32")
+    daily["rolling_incidents"] = daily["incidents"].rolling(window=7, min_periods=1).mean()
+
+    if not daily.empty:
+        daily_chart = (
+            alt.Chart(daily)
+            .mark_line(color="#d62728")
+            .encode(
+                x=alt.X("date_only:T", title="Date"),
+                y=alt.Y("rolling_incidents:Q", title="7-Day Rolling Average"),
+                tooltip=["date_only:T", "incidents:Q", "rolling_incidents:Q"]
+            )
+            .properties(height=300)
+        )
+        st.altair_chart(daily_chart, use_container_width=True)
+    else:
+        st.info("No data available for the timeline.")
+
+# -------------------------------------------------------------------
+# 2. Interactive Dashboard
+# -------------------------------------------------------------------
+@st.fragment
+def dashboard_section(filtered_df: pd.DataFrame):
+    st.subheader("2. Interactive Analysis: Correlating Crime Types with Locations")
+    st.markdown("""
+Safety varies significantly by neighborhood and by the type of offense. This interactive section lets you drill down into those specifics.
+
+**How to use this:** The Bar Chart (left) and the Map (right) are linked. **Click on any bar**—for example, "MOTOR VEHICLE THEFT"—to instantly filter the map. This interaction reveals hidden spatial truths: you might find that while Battery incidents are widespread, Theft is often concentrated in high-traffic commercial districts. Unselected bars will fade to gray, indicating that the map is currently focused on your selection.
+""")
+
+    # Prepare Interaction Data
+    # Groupings must preserve numeric integrity but be serializable
+    if is_full_date_range:
+        chart_data = (
+            apply_filters_to_cube(crime_area_cube(df, data_token))
+            .groupby(["primary_description", "community_area"], observed=True, sort=False)["count"]
+            .sum()
+            .reset_index()
+        )
+    else:
+        chart_data = filtered_df.groupby(["primary_description", "community_area"], observed=True, sort=False).size().reset_index(name="count")
+
+    # Ensure types for Altair
+    chart_data["count"] = chart_data["count"].astype(int)
+    # Convert Int64 community_area to string for lookup keys (removing .0)
+    chart_data["community_area"] = chart_data["community_area"].astype(str)
+
+    # Top-20 totals computed server-side: the bar chart ships 20 rows instead
+    # of asking Vega-Lite to aggregate, rank, and filter thousands client-side
+    bar_data = (
+        chart_data.groupby("primary_description", observed=True, sort=False, as_index=False)["count"]
+        .sum()
+        .nlargest(20, "count")
+    )
+
+    # The map only ever shows types selectable in the bar chart, so restrict
+    # its frame to the top-20 types before serialization
+    map_data = chart_data[chart_data["primary_description"].isin(bar_data["primary_description"])]
+
+    if not chart_data.empty:
+        # Selection Signal
+        selection = alt.selection_point(fields=["primary_description"], on="click")
+
+        # Bar Chart (Left)
+        bar_chart = (
+            alt.Chart(bar_data)
+            .mark_bar()
+            .encode(
+                x=alt.X("count:Q", title="Incidents"),
+                y=alt.Y("primary_description:N", sort="-x", title="Crime Type"),
+                color=alt.condition(
+                    selection,
+                    alt.value("#1f77b4"),  # Selected: Blue
+                    alt.value("lightgray") # Unselected: Gray
+                ),
+                tooltip=["primary_description:N", "count:Q"]
+            )
+            .add_params(selection)
+            .properties(title="Top Crime Types (Click to Filter Map)", width="container", height=400)
+        )
+
+        # Map Chart (Right)
+        chicago_neighborhoods = get_chicago_neighborhoods()
+
+        map_chart = (
+            alt.Chart(map_data)
+            .transform_filter(selection)
+            .transform_aggregate(
+                crime_count="sum(count)",
+                groupby=["community_area"]
+            )
+            .transform_lookup(
+                lookup="community_area",
+                from_=alt.LookupData(
+                    data=chicago_neighborhoods,
+                    key="properties.area_num_1",
+                    fields=["type", "geometry", "properties"]
+                )
+            )
+            .transform_calculate(
+                crime_count_filled="isValid(datum.crime_count) ? datum.crime_count : 0"
+            )
+            .mark_geoshape(stroke="white", strokeWidth=0.5)
+            .encode(
+                color=alt.Color(
+                    "crime_count_filled:Q",
+                    title="Counts",
+                    scale=alt.Scale(scheme="reds")
+                ),
+                tooltip=[
+                    alt.Tooltip("properties.community:N", title="Community"),
+                    alt.Tooltip("crime_count_filled:Q", title="Count"),
+                ]
+            )
+            .project(type="mercator")
+            .properties(title="Geospatial Distribution", width="container", height=400)
+        )
+
+        # Use hconcat for Linked Views side-by-side layout
+        combined_dashboard = alt.hconcat(bar_chart, map_chart).resolve_legend(color="independent")
+
+        st.altair_chart(combined_dashboard, use_container_width=True)
+
+    else:
+        st.info("No data available for the dashboard.")
+
+# -------------------------------------------------------------------
+# 3. Heatmap
+# -------------------------------------------------------------------
+@st.fragment
+def heatmap_section(filtered_df: pd.DataFrame):
+    st.subheader("3. The 'Risk Clock': Weekday vs. Hour Analysis")
+    st.markdown("""
+Beyond where crime happens, it is crucial to understand when it happens. This heatmap aggregates thousands of incidents to visualize the city's "Risk Clock."
+
+The vertical axis represents the **Day of the Week**, while the horizontal axis tracks the **Hour of the Day** (0–23). Darker orange zones indicate high-intensity windows. You will often see distinct "signatures" here: the morning rush hour may bring a wave of property crimes, while late nights on weekends often see a rise in public safety incidents. Use this to understand the typical weekly schedule of safety in Chicago.
+""")
+
+    if is_full_date_range:
+        hourly = (
+            apply_filters_to_cube(weekday_hour_cube(df, data_token))
+            .groupby(["weekday", "hour"], observed=True, sort=False)["count"]
+            .sum()
+            .reset_index()
+        )
+    else:
+        hourly = filtered_df.groupby(["weekday", "hour"], observed=True, sort=False).size().reset_index(name="count")
+    hourly["count"] = hourly["count"].astype("int32")
+    weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    # Map the int8 dayofweek codes to display names only for the 168-row result
+    hourly["weekday"] = hourly["weekday"].map(dict(enumerate(weekday_order)))
+
+    if not hourly.empty:
+        heatmap = (
+            alt.Chart(hourly)
+            .mark_rect()
+            .encode(
+                x=alt.X("hour:O", title="Hour (0-23)"),
+                y=alt.Y("weekday:N", title="Day", sort=weekday_order),
+                color=alt.Color("count:Q", title="Incidents", scale=alt.Scale(scheme="oranges")),
+                tooltip=["weekday:N", "hour:O", "count:Q"]
+            )
+            .properties(height=350)
+        )
+        st.altair_chart(heatmap, use_container_width=True)
+    else:
+        st.info("No data available for heatmap.")
+
+daily_section()
+st.divider()
+dashboard_section(filtered_df)
+st.divider()
+heatmap_section(filtered_df)
+
+st.divider()
 st.link_button("Source: Chicago Data Portal", "https://data.cityofchicago.org/Public-Safety/Crimes-2001-to-Present/ijzp-q8t2/about_data", type="primary")
\ No newline at end of file